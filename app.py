@@ -1,23 +1,83 @@
 from __future__ import annotations
+import atexit
+import gzip
+import hashlib
+import json
 import os
+import queue
 import sqlite3
+import sys
+import threading
 import time
-import math
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 from typing import List, Tuple, Optional
-from datetime import datetime
+from types import MappingProxyType, SimpleNamespace
 from email.message import EmailMessage
+from email.utils import getaddresses, parseaddr
 import smtplib
 from urllib.parse import urlencode, quote
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import (
-    Flask, abort, flash, g, jsonify, redirect, render_template,
-    request, session, url_for
+    Flask, abort, flash, g, has_request_context, jsonify, redirect,
+    render_template, request, session, url_for
 )
 from flask import current_app
 
 APP_DIR = os.path.abspath(os.path.dirname(__file__))
 
+# Lead/e-mail archive files are serialized in memory and written in one call.
+ARCHIVE_WRITE_BUFFER = 128 * 1024
+# The JSONL lead log stays open in the lead worker; buffered lines are flushed
+# every JSONL_FLUSH_RECORDS leads or JSONL_FLUSH_INTERVAL seconds.
+JSONL_WRITE_BUFFER = 1 << 20
+JSONL_FLUSH_RECORDS = 32
+JSONL_FLUSH_INTERVAL = 0.5
+# created_at -> file-name-safe timestamp: 2024-01-02T03:04:05 -> 20240102_030405
+_TS_TRANS = str.maketrans({":": "", "-": "", "T": "_"})
+
+# Directories this process has already created; see ensure_dir().
+_ensured_dirs: set = set()
+
+
+def ensure_dir(path: str) -> None:
+    """os.makedirs(path, exist_ok=True), at most once per path and process."""
+    if path and path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
+
+POLICY_SLUGS = frozenset({"privacy", "cookies", "terms", "disclaimer", "rodo"})
+
+# Nominatim requires a descriptive User-Agent. Resolved once per process.
+NOMINATIM_USER_AGENT = (
+    (os.environ.get("NOMINATIM_USER_AGENT") or "").strip()
+    or "xlevage-site/1.0 (contact: biuro.x-estetik@op.pl)"
+)
+
+# Timestamps are stored as UTC ISO strings with second precision. The
+# formatted string is cached for the current second (time.strftime runs in C),
+# so bursts of writes do not each build and format a datetime.
+_ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_iso_cache = (0, "")
+
+
+def utc_now_iso() -> str:
+    global _iso_cache
+    t = int(time.time())
+    cached = _iso_cache
+    if cached[0] == t:
+        return cached[1]
+    value = time.strftime(_ISO_FORMAT, time.gmtime(t))
+    _iso_cache = (t, value)
+    return value
+
+
+def current_year() -> int:
+    return int(utc_now_iso()[:4])
+
 # ---------------------------------------------------------------------------
 # Storage paths
 #
@@ -30,9 +90,13 @@ APP_DIR = os.path.abspath(os.path.dirname(__file__))
 # If you set DATA_DIR but forget to attach the disk (or mount path differs),
 # Render will NOT allow writing to /var/data and the app will crash.
 # To be resilient, we automatically fall back to a writable local directory.
+#
+# The result is fixed for the process lifetime, so the write probes run once
+# per process even if create_app() is called again.
 # ---------------------------------------------------------------------------
 
-def _first_writable_dir(candidates: List[str]) -> str:
+@lru_cache(maxsize=8)
+def _first_writable_dir(candidates: Tuple[str, ...]) -> str:
     """Return the first directory we can create/write to."""
     for d in candidates:
         if not d:
@@ -52,17 +116,18 @@ def _first_writable_dir(candidates: List[str]) -> str:
     return d
 
 
+@lru_cache(maxsize=1)
 def resolve_storage_paths() -> Tuple[str, str]:
     """Return (instance_dir, db_path) using env vars with safe fallbacks."""
     data_dir = (os.environ.get("DATA_DIR") or "").strip()
     desired_instance = os.path.join(data_dir, "instance") if data_dir else ""
 
     # Pick first writable among: desired (disk), app-local, /tmp
-    instance_dir = _first_writable_dir([
+    instance_dir = _first_writable_dir((
         desired_instance,
         os.path.join(APP_DIR, "instance"),
         os.path.join("/tmp", "instance"),
-    ])
+    ))
 
     if desired_instance and os.path.abspath(instance_dir) != os.path.abspath(desired_instance):
         print(
@@ -141,25 +206,53 @@ def create_app():
         SMTP_TLS=str(os.environ.get("SMTP_TLS", "1")).strip().lower() in {"1", "true", "yes"},
 
         # External requests
-        NOMINATIM_USER_AGENT=os.environ.get(
-            "NOMINATIM_USER_AGENT",
-            "xlevage-site/1.0 (contact: biuro.x-estetik@op.pl)",
-        ),
+        NOMINATIM_USER_AGENT=NOMINATIM_USER_AGENT,
+
+        # Static files. Unversioned URLs are cached for a day; URLs carrying a
+        # `?v=` cache-buster (site.css/site.js) are cached as immutable.
+        SEND_FILE_MAX_AGE_DEFAULT=int(os.environ.get("STATIC_MAX_AGE", "86400")),
     )
 
     # If JSONL path is not explicitly set, default it under LEADS_DIR.
     if not (app.config.get("LEADS_JSONL_PATH") or "").strip():
         app.config["LEADS_JSONL_PATH"] = os.path.join(app.config.get("LEADS_DIR") or "", "leads.jsonl")
+
+    # Snapshot of the settings used on the lead path. They are fixed for the
+    # process lifetime, so read and strip them once instead of per lead.
+    smtp_user = (app.config.get("SMTP_USER") or "").strip()
+    mail_to = (app.config.get("MAIL_TO") or "").strip()
+    smtp_from = (app.config.get("SMTP_FROM") or "").strip() or smtp_user
+    mail_cfg = SimpleNamespace(
+        mail_to=mail_to,
+        # Envelope addresses, parsed from the headers the same way send_message() does.
+        mail_rcpts=[addr for _name, addr in getaddresses([mail_to]) if addr],
+        smtp_host=(app.config.get("SMTP_HOST") or "").strip(),
+        smtp_user=smtp_user,
+        smtp_pass=(app.config.get("SMTP_PASS") or "").strip(),
+        smtp_from=smtp_from,
+        smtp_from_addr=parseaddr(smtp_from)[1],
+        smtp_port=int(app.config.get("SMTP_PORT") or 587),
+        smtp_tls=bool(app.config.get("SMTP_TLS")),
+        brand=app.config.get("BRAND", "X‑LEVAGE"),
+        leads_dir=(app.config.get("LEADS_DIR") or "").strip(),
+        jsonl_path=(app.config.get("LEADS_JSONL_PATH") or "").strip(),
+        archive_dir=(app.config.get("MAIL_ARCHIVE_DIR") or "").strip(),
+    )
     # Ensure instance dir exists (resolve_storage_paths already does, but keep safe)
     os.makedirs(instance_dir, exist_ok=True)
     # Ensure data directories exist (best-effort)
     for _d in (app.config.get('LEADS_DIR'), app.config.get('MAIL_ARCHIVE_DIR')):
         try:
             if _d:
-                os.makedirs(_d, exist_ok=True)
+                ensure_dir(_d)
         except Exception as _exc:
             print(f"[WARN] Could not create data dir {_d}: {_exc}")
 
+    # Lead side effects (disk archive + SMTP) are queued for a single worker
+    # thread so the POST handlers can redirect right after the SQLite insert.
+    # Queued leads are drained on interpreter shutdown.
+    lead_queue = queue.Queue()
+    app.extensions["lead_queue"] = lead_queue
 
     # Basic safety: show a warning in logs if you forgot to configure secrets.
     if not debug:
@@ -168,15 +261,24 @@ def create_app():
         if app.config["ADMIN_USER"] == "admin" and app.config["ADMIN_PASS"] == "admin":
             print("[WARN] Admin credentials are still admin/admin. Change ADMIN_USER and ADMIN_PASS.")
 
-    @app.before_request
-    def _db_before_request():
-        g.db = get_db()
+    # Long-lived connections for the app lifetime: one writer + a read pool.
+    # Connections are taken lazily by get_db(), so static files never touch them.
+    app.extensions["sqlite"] = open_sqlite_pool(db_path)
+    # Rendered public pages, see cached_view().
+    app.extensions["view_cache"] = {}
+    # Positive geocoding results, see lookup_geocode_cache().
+    app.extensions["geocode_memo"] = {}
 
     @app.teardown_appcontext
     def _db_teardown(_exc):
         db = g.pop("db", None)
-        if db is not None:
-            db.close()
+        if db is None:
+            return
+        pool = app.extensions["sqlite"]
+        if g.pop("db_is_reader", False):
+            checkin_reader(pool, db)
+        else:
+            pool.writer_lock.release()
 
     with app.app_context():
         init_db()
@@ -189,6 +291,9 @@ def create_app():
         if not is_admin():
             return redirect(url_for("admin_login", next=request.path))
 
+    # Pure functions of their arguments, and templates pass the same contact
+    # address on every render, so the built URLs are memoized.
+    @lru_cache(maxsize=64)
     def mailto_link(to_email: str, subject: str = "", body: str = "") -> str:
         """Build a safe mailto: URL for templates."""
         to_email = (to_email or "").strip()
@@ -202,6 +307,7 @@ def create_app():
         query = urlencode(q, quote_via=quote) if q else ""
         return f"mailto:{to_email}?{query}" if query else f"mailto:{to_email}"
 
+    @lru_cache(maxsize=64)
     def gmail_compose_link(to_email: str, subject: str = "", body: str = "") -> str:
         """Build a Gmail web compose URL as a cross-platform fallback.
 
@@ -229,17 +335,16 @@ def create_app():
         This is useful on Render when you want a simple file-level archive in addition to SQLite.
         It is best-effort and must never break the user flow.
         """
-        leads_dir = (app.config.get('LEADS_DIR') or '').strip()
-        jsonl_path = (app.config.get('LEADS_JSONL_PATH') or '').strip()
+        leads_dir = mail_cfg.leads_dir
+        jsonl_path = mail_cfg.jsonl_path
         if not leads_dir and not jsonl_path:
             return
         try:
             if leads_dir:
-                os.makedirs(leads_dir, exist_ok=True)
+                ensure_dir(leads_dir)
             if jsonl_path:
-                os.makedirs(os.path.dirname(jsonl_path), exist_ok=True)
-            safe_ts = created_at.replace(':', '').replace('-', '').replace('T', '_')
-            import json
+                ensure_dir(os.path.dirname(jsonl_path))
+            safe_ts = created_at.translate(_TS_TRANS)
             payload = {
                 'id': int(lead_id),
                 'created_at_utc': created_at,
@@ -253,41 +358,70 @@ def create_app():
             if leads_dir:
                 fn = f"lead_{lead_id}_{safe_ts}.json"
                 path = os.path.join(leads_dir, fn)
-                with open(path, 'w', encoding='utf-8') as f:
-                    json.dump(payload, f, ensure_ascii=False, indent=2)
+                data = json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')
+                # Write-then-rename so a crash never leaves a torn file behind.
+                # No fsync: SQLite holds the durable copy of the lead.
+                tmp = path + '.tmp'
+                with open(tmp, 'wb', buffering=ARCHIVE_WRITE_BUFFER) as f:
+                    f.write(data)
+                os.replace(tmp, path)
 
             # 2) Append-only JSONL file (easy to backup/grep)
             if jsonl_path:
-                with open(jsonl_path, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps(payload, ensure_ascii=False))
-                    f.write("\n")
+                jsonl_append(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n")
         except Exception as exc:
             print(f"[WARN] Failed to archive lead to disk: {exc}")
 
+    # Long-lived JSONL writer, only touched by the lead worker (and at exit).
+    jsonl = SimpleNamespace(f=None, pending=0, first_at=0.0)
+
+    def jsonl_append(line: bytes) -> None:
+        if jsonl.f is None:
+            jsonl.f = open(mail_cfg.jsonl_path, 'ab', buffering=JSONL_WRITE_BUFFER)
+        jsonl.f.write(line)
+        if not jsonl.pending:
+            jsonl.first_at = time.monotonic()
+        jsonl.pending += 1
+        if jsonl.pending >= JSONL_FLUSH_RECORDS:
+            jsonl_flush()
+
+    def jsonl_flush() -> None:
+        if jsonl.f is None or not jsonl.pending:
+            return
+        jsonl.pending = 0
+        try:
+            jsonl.f.flush()
+        except Exception as exc:
+            print(f"[WARN] Failed to flush lead JSONL archive: {exc}")
+            try:
+                jsonl.f.close()
+            except Exception:
+                pass
+            jsonl.f = None  # reopen on the next lead
+
+    def jsonl_close() -> None:
+        jsonl_flush()
+        if jsonl.f is not None:
+            jsonl.f.close()
+            jsonl.f = None
+
     def send_lead_email(*, name: str, email: str, phone: str, message: str, lead_id: Optional[int] = None, created_at: Optional[str] = None) -> bool:
         """Send a contact form notification via SMTP.
 
         Delivery is best-effort: if SMTP is not configured or sending fails,
         the lead is still saved to SQLite and the user sees a success message.
         """
-
-        mail_to = (app.config.get("MAIL_TO") or "").strip()
-        smtp_host = (app.config.get("SMTP_HOST") or "").strip()
-        smtp_user = (app.config.get("SMTP_USER") or "").strip()
-        smtp_pass = (app.config.get("SMTP_PASS") or "").strip()
-        smtp_from = (app.config.get("SMTP_FROM") or "").strip() or smtp_user
-        smtp_port = int(app.config.get("SMTP_PORT") or 587)
-        smtp_tls = bool(app.config.get("SMTP_TLS"))
+        cfg = mail_cfg
 
         # If SMTP isn't configured, silently skip.
-        if not (mail_to and smtp_host and smtp_from):
+        if not (cfg.mail_to and cfg.smtp_host and cfg.smtp_from):
             return False
 
         try:
             msg = EmailMessage()
-            msg["Subject"] = f"Nowe zapytanie — {app.config.get('BRAND', 'X‑LEVAGE')}"
-            msg["From"] = smtp_from
-            msg["To"] = mail_to
+            msg["Subject"] = f"Nowe zapytanie — {cfg.brand}"
+            msg["From"] = cfg.smtp_from
+            msg["To"] = cfg.mail_to
 
             lines = [
                 "Nowe zapytanie z formularza kontaktowego:",
@@ -299,37 +433,72 @@ def create_app():
                 "Wiadomość:",
                 message or "-",
                 "",
-                f"Czas (UTC): {datetime.utcnow().isoformat(timespec='seconds')}",
+                f"Czas (UTC): {utc_now_iso()}",
             ]
             msg.set_content("\n".join(lines))
+            # Flatten once (with SMTP line endings) for both the archive and the send.
+            raw = msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
 
             # Best-effort archive of the raw email on disk (optional)
             try:
-                archive_dir = (app.config.get('MAIL_ARCHIVE_DIR') or '').strip()
+                archive_dir = cfg.archive_dir
                 if archive_dir and lead_id is not None and created_at:
-                    os.makedirs(archive_dir, exist_ok=True)
-                    safe_ts = created_at.replace(':', '').replace('-', '').replace('T', '_')
+                    ensure_dir(archive_dir)
+                    safe_ts = created_at.translate(_TS_TRANS)
                     eml_path = os.path.join(archive_dir, f"lead_{lead_id}_{safe_ts}.eml")
-                    with open(eml_path, 'wb') as f:
-                        f.write(msg.as_bytes())
+                    with open(eml_path, 'wb', buffering=ARCHIVE_WRITE_BUFFER) as f:
+                        f.write(raw)
             except Exception as _exc:
                 print(f"[WARN] Failed to archive email: {_exc}")
 
-            with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                server.ehlo()
-                if smtp_tls:
-                    server.starttls()
-                    server.ehlo()
-                if smtp_user and smtp_pass:
-                    server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
+            smtp_sendmail(
+                cfg.smtp_from_addr, cfg.mail_rcpts, raw,
+                host=cfg.smtp_host, port=cfg.smtp_port, user=cfg.smtp_user,
+                password=cfg.smtp_pass, tls=cfg.smtp_tls,
+            )
             return True
         except Exception as exc:
             print(f"[WARN] Failed to send lead email: {exc}")
             return False
 
+    def deliver_lead(**lead) -> None:
+        """Archive the lead on disk and send the e-mail notification.
+
+        Runs on the lead worker thread; both steps are best-effort and read only
+        the `mail_cfg` snapshot, so no app/request context is needed here.
+        """
+        archive_lead_to_disk(**lead)
+        send_lead_email(**lead)
+
+    def _drain():
+        while True:
+            try:
+                lead = lead_queue.get(timeout=JSONL_FLUSH_INTERVAL if jsonl.pending else None)
+            except queue.Empty:
+                jsonl_flush()
+                continue
+            try:
+                deliver_lead(**lead)
+            except Exception as exc:
+                print(f"[WARN] Lead delivery failed: {exc}")
+            finally:
+                if jsonl.pending and time.monotonic() - jsonl.first_at >= JSONL_FLUSH_INTERVAL:
+                    jsonl_flush()
+                lead_queue.task_done()
+
+    threading.Thread(target=_drain, name="lead-worker", daemon=True).start()
+    # atexit runs in reverse order: drain the queue first, then close the log.
+    atexit.register(jsonl_close)
+    atexit.register(lead_queue.join)
+
+    # Filtered notification counts: q -> (expires_monotonic, total). The total
+    # is only shown for orientation, so a count up to LEAD_COUNT_TTL seconds
+    # old is fine; new leads clear it in this process.
+    lead_counts: dict = {}
+
     # ---------- Public ----------
     @app.get("/")
+    @cached_view(600)
     def index():
         effects = list_static_images("efekty_zabiegow")
         devices = list_static_images("fotos")
@@ -340,39 +509,42 @@ def create_app():
         return render_template("index.html", effects=effects, devices=devices, stats=stats)
 
     @app.get("/laser-tulowy-x-levage-pro")
+    @cached_view(600)
     def pro():
         effects = list_static_images("efekty_zabiegow")
         return render_template("pro.html", effects=effects)
 
     @app.get("/x-levage-erbo")
+    @cached_view(600)
     def erbo():
         effects = list_static_images("efekty_zabiegow")
         return render_template("erbo.html", effects=effects)
 
     @app.get("/gabinet")
+    @cached_view(120, query_string=True, version=lambda: clinics_version(get_db()))
     def gabinet():
         # Public page: by default show all official locations.
         # view: all | ambassadors | authorized
         view = request.args.get("view", "all")
         q = request.args.get("q", "").strip()
-        clinics = search_clinics(view=view, q=q, limit=500)
+        clinics = cached_search_clinics(view, q, 500, clinics_version(get_db()))
         return render_template("gabinet.html", clinics=clinics, view=view, q=q)
 
     @app.get("/umow-prezentacje")
     def prezentacja():
         # Only ambassadors (incl. Showroom) offer free device presentations.
-        ambassador_clinics = search_clinics(view="ambassadors", q="", limit=500)
+        ambassador_clinics = cached_search_clinics("ambassadors", "", 500, clinics_version(get_db()))
         return render_template("prezentacja.html", ambassador_clinics=ambassador_clinics)
 
     @app.post("/umow-prezentacje")
     def prezentacja_post():
-        name = request.form.get("name", "").strip()
-        email = request.form.get("email", "").strip()
-        phone = request.form.get("phone", "").strip()
-        city = request.form.get("city", "").strip()
-        preferred_date = request.form.get("preferred_date", "").strip()
-        preferred_clinic = request.form.get("preferred_clinic", "").strip()
-        note = request.form.get("message", "").strip()
+        name = _form("name")
+        email = _form("email")
+        phone = _form("phone")
+        city = _form("city")
+        preferred_date = _form("preferred_date")
+        preferred_clinic = _form("preferred_clinic")
+        note = _form("message")
 
         if not email and not phone:
             flash("Podaj e‑mail lub telefon, abyśmy mogli się skontaktować.", "error")
@@ -392,19 +564,19 @@ def create_app():
         message = "\n".join(lines)
 
         db = get_db()
-        created_at = datetime.utcnow().isoformat(timespec="seconds")
+        created_at = utc_now_iso()
         cur = db.execute(
             "INSERT INTO leads(name,email,phone,message,created_at) VALUES(?,?,?,?,?)",
             (name, email, phone, message, created_at),
         )
         lead_id = cur.lastrowid
         db.commit()
+        lead_counts.clear()
 
-        # Best-effort file archive on disk (optional).
-        archive_lead_to_disk(lead_id=lead_id, created_at=created_at, name=name, email=email, phone=phone, message=message)
-
-        # Best-effort email notification (if SMTP configured).
-        send_lead_email(name=name, email=email, phone=phone, message=message, lead_id=lead_id, created_at=created_at)
+        # Best-effort file archive + email notification, off the request path.
+        lead_queue.put(dict(
+            lead_id=lead_id, created_at=created_at, name=name, email=email, phone=phone, message=message,
+        ))
 
         flash("Dziękujemy. Skontaktujemy się wkrótce.", "success")
         return redirect(url_for("prezentacja"))
@@ -413,34 +585,43 @@ def create_app():
     def api_clinics():
         view = request.args.get("view", "all")
         q = request.args.get("q", "").strip()
-        clinics = search_clinics(view=view, q=q, limit=2000)
-        return jsonify({"clinics": clinics})
+        version = clinics_version(get_db())
+        # The ETag is known before any rows are read, so repeat polls of an
+        # unchanged listing cost one meta lookup and no serialization.
+        etag = clinics_etag(view, q, version)
+        if request.if_none_match.contains_weak(etag):
+            resp = app.response_class(status=304)
+        else:
+            resp = app.response_class(clinics_json(view, q, version), mimetype="application/json")
+        resp.set_etag(etag)
+        resp.cache_control.max_age = 60
+        return resp
 
     @app.post("/lead")
     def lead():
-        name = request.form.get("name", "").strip()
-        email = request.form.get("email", "").strip()
-        phone = request.form.get("phone", "").strip()
-        message = request.form.get("message", "").strip()
+        name = _form("name")
+        email = _form("email")
+        phone = _form("phone")
+        message = _form("message")
 
         if not email and not phone:
             flash("Podaj e‑mail lub telefon, abyśmy mogli się skontaktować.", "error")
             return redirect(request.referrer or url_for("index"))
 
         db = get_db()
-        created_at = datetime.utcnow().isoformat(timespec="seconds")
+        created_at = utc_now_iso()
         cur = db.execute(
             "INSERT INTO leads(name,email,phone,message,created_at) VALUES(?,?,?,?,?)",
             (name, email, phone, message, created_at),
         )
         lead_id = cur.lastrowid
         db.commit()
+        lead_counts.clear()
 
-        # Best-effort file archive on disk (optional).
-        archive_lead_to_disk(lead_id=lead_id, created_at=created_at, name=name, email=email, phone=phone, message=message)
-
-        # Best-effort email notification (if SMTP configured).
-        send_lead_email(name=name, email=email, phone=phone, message=message, lead_id=lead_id, created_at=created_at)
+        # Best-effort file archive + email notification, off the request path.
+        lead_queue.put(dict(
+            lead_id=lead_id, created_at=created_at, name=name, email=email, phone=phone, message=message,
+        ))
 
         flash("Dziękujemy. Skontaktujemy się wkrótce.", "success")
         return redirect(request.referrer or url_for("index"))
@@ -448,8 +629,7 @@ def create_app():
     # ---------- Policies ----------
     @app.get("/policies/<slug>")
     def policies(slug):
-        allowed = {"privacy", "cookies", "terms", "disclaimer", "rodo"}
-        if slug not in allowed:
+        if slug not in POLICY_SLUGS:
             abort(404)
         return render_template(f"policies/{slug}.html")
 
@@ -460,8 +640,8 @@ def create_app():
 
     @app.post("/admin/login")
     def admin_login_post():
-        username = (request.form.get("username", "") or "").strip()
-        password = (request.form.get("password", "") or "").strip()
+        username = _form("username")
+        password = _form("password")
         nxt = request.form.get("next") or url_for("admin_dashboard")
         if username == app.config.get("ADMIN_USER") and password == app.config.get("ADMIN_PASS"):
             session["is_admin"] = True
@@ -482,7 +662,7 @@ def create_app():
         if ra: return ra
         view = request.args.get("view", "all")
         q = request.args.get("q", "").strip()
-        clinics = search_clinics(view=view, q=q, limit=2000)
+        clinics = cached_search_clinics(view, q, 2000, clinics_version(get_db()))
         return render_template("admin/dashboard.html", clinics=clinics, view=view, q=q)
 
     @app.get("/admin/clinics/new")
@@ -517,7 +697,11 @@ def create_app():
         if not clinic:
             abort(404)
         form = clinic_from_form()
-        upsert_clinic(cid, form, geocode_if_missing=True)
+        try:
+            upsert_clinic(cid, form, geocode_if_missing=True)
+        except sqlite3.IntegrityError:
+            flash("Gabinet o tej nazwie i adresie już istnieje.", "error")
+            return redirect(url_for("admin_clinic_edit", cid=cid))
         flash("Zapisano zmiany.", "success")
         return redirect(url_for("admin_dashboard") + f"?highlight={cid}")
 
@@ -525,9 +709,7 @@ def create_app():
     def admin_clinic_delete(cid):
         ra = require_admin()
         if ra: return ra
-        db = get_db()
-        db.execute("DELETE FROM clinics WHERE id=?", (cid,))
-        db.commit()
+        delete_clinic(cid)
         flash("Usunięto.", "success")
         return redirect(url_for("admin_dashboard"))
 
@@ -541,12 +723,27 @@ def create_app():
     def admin_import_post():
         ra = require_admin()
         if ra: return ra
-        raw = request.form.get("raw", "").strip()
+        raw = _form("raw")
         default_type = request.form.get("default_type", "authorized")
         created, updated, skipped = bulk_import(raw, default_type=default_type)
         flash(f"Import zakończony: dodano {created}, zaktualizowano {updated}, pominięto {skipped}.", "success")
         return redirect(url_for("admin_dashboard"))
 
+    def cached_lead_count(db, q, where_sql, params) -> int:
+        if not q:
+            # Unfiltered: an index-only COUNT, always exact (and so correct
+            # across workers, unlike the per-process cache).
+            return db.execute("SELECT COUNT(1) AS c FROM leads").fetchone()["c"]
+        now = time.monotonic()
+        hit = lead_counts.get(q)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+        total = db.execute(f"SELECT COUNT(1) AS c FROM leads{where_sql}", params).fetchone()["c"]
+        if len(lead_counts) >= 64:
+            lead_counts.clear()
+        lead_counts[q] = (now + LEAD_COUNT_TTL, total)
+        return total
+
     @app.get("/admin/notifications")
     def admin_notifications():
         """Admin view: list contact form submissions (leads).
@@ -564,28 +761,57 @@ def create_app():
             page = 1
         page = max(1, page)
         per_page = 50
-        offset = (page - 1) * per_page
+
+        # Keyset pagination: `after`/`before` carry the (created_at, id) of the
+        # last/first row of the neighbouring page, so the query seeks through
+        # ix_leads_created instead of skipping OFFSET rows. `page` is only
+        # used for display.
+        after = parse_lead_cursor(request.args.get("after", ""))
+        before = None if after else parse_lead_cursor(request.args.get("before", ""))
 
         db = get_db()
         where = []
         params: list = []
         if q:
-            where.append("(name LIKE ? OR email LIKE ? OR phone LIKE ? OR message LIKE ?)")
-            qq = f"%{q}%"
+            where.append(
+                "(name LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\'"
+                " OR phone LIKE ? ESCAPE '\\' OR message LIKE ? ESCAPE '\\')"
+            )
+            qq = like_contains(q)
             params.extend([qq, qq, qq, qq])
 
         where_sql = (" WHERE " + " AND ".join(where)) if where else ""
-
-        total = db.execute(f"SELECT COUNT(1) AS c FROM leads{where_sql}", params).fetchone()["c"]
+        total = cached_lead_count(db, q, where_sql, params)
+
+        seek = []
+        order = "DESC"
+        if after:
+            seek.append("(created_at, id) < (?, ?)")
+        elif before:
+            seek.append("(created_at, id) > (?, ?)")
+            order = "ASC"
+        page_sql = (" WHERE " + " AND ".join(where + seek)) if where or seek else ""
         rows = db.execute(
-            f"SELECT * FROM leads{where_sql} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
-            params + [per_page, offset],
+            f"SELECT * FROM leads{page_sql} ORDER BY created_at {order}, id {order} LIMIT ?",
+            params + list(after or before or ()) + [per_page + 1],
         ).fetchall()
 
-        leads = [row_to_dict(r) for r in rows]
-        total_pages = max(1, math.ceil((total or 0) / per_page))
-        if page > total_pages:
-            page = total_pages
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+        if before:
+            rows.reverse()
+            has_prev, has_next = more, True
+        else:
+            has_prev, has_next = bool(after), more
+        if not has_prev:
+            page = 1
+        elif page == 1:
+            page = 2
+
+        leads = rows_to_dicts(rows)
+        # The filtered total may lag behind by LEAD_COUNT_TTL; never let it
+        # claim fewer pages than the cursors just walked through.
+        total_pages = max(page + has_next, (int(total or 0) + per_page - 1) // per_page)
 
         return render_template(
             "admin/notifications.html",
@@ -595,6 +821,8 @@ def create_app():
             total_pages=total_pages,
             total=total,
             per_page=per_page,
+            prev_cursor=f"{leads[0]['created_at']},{leads[0]['id']}" if has_prev and leads else None,
+            next_cursor=f"{leads[-1]['created_at']},{leads[-1]['id']}" if has_next and leads else None,
         )
 
     @app.post("/admin/geocode/<int:cid>")
@@ -604,52 +832,307 @@ def create_app():
         clinic = get_clinic(cid)
         if not clinic:
             abort(404)
-        lat, lon = geocode_address(clinic["address"])
+        db = get_db()
+        lat, lon = lookup_geocode_cache(db, clinic["address"]) or (None, None)
         if lat and lon:
-            db = get_db()
-            db.execute("UPDATE clinics SET lat=?, lon=?, updated_at=? WHERE id=?",
-                       (lat, lon, datetime.utcnow().isoformat(timespec="seconds"), cid))
+            db.execute(_SQL_SET_CLINIC_COORDS, (lat, lon, utc_now_iso(), cid))
             db.commit()
+            invalidate_clinics()
             return jsonify({"ok": True, "lat": lat, "lon": lon})
+        # Explicit request from the admin: retry even a cached failure, and
+        # replace whatever coordinates the clinic has (e.g. after an address edit).
+        if request_geocode(clinic["address"], overwrite_id=cid):
+            return jsonify({"ok": True, "queued": True}), 202
         return jsonify({"ok": False}), 400
 
+    @app.get("/admin/geocode/<int:cid>")
+    def admin_geocode_status(cid):
+        """Polled by the admin UI after a queued lookup (202 while in flight)."""
+        ra = require_admin()
+        if ra: return ra
+        clinic = get_clinic(cid)
+        if not clinic:
+            abort(404)
+        if geocode_pending(clinic["address"]):
+            return jsonify({"ok": True, "queued": True}), 202
+        # Re-read: the result may have been stored since the first read.
+        clinic = get_clinic(cid)
+        if not clinic:
+            abort(404)
+        # Success only once the clinic holds the looked-up coordinates, not
+        # whatever it had before the lookup.
+        lat, lon = lookup_geocode_cache(get_db(), clinic["address"]) or (None, None)
+        if lat and lon and (clinic["lat"], clinic["lon"]) == (lat, lon):
+            return jsonify({"ok": True, "lat": lat, "lon": lon})
+        return jsonify({"ok": False}), 400
+
+    # ---------- Response headers ----------
+    @app.after_request
+    def _static_cache_and_gzip(resp):
+        if request.endpoint == "static" and request.args.get("v") and resp.status_code == 200:
+            resp.cache_control.public = True
+            resp.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+            resp.cache_control.immutable = True
+        return gzip_response(resp)
+
     # ---------- Template globals ----------
+    # Everything except the admin flag and the year is fixed for the process
+    # lifetime, so the mapping is built once instead of on every render.
+    static_globals = MappingProxyType({
+        "SITE_NAME": app.config["SITE_NAME"],
+        "BRAND": app.config["BRAND"],
+        "CONTACT_EMAIL": app.config["CONTACT_EMAIL"],
+        "CONTACT_PHONE": app.config["CONTACT_PHONE"],
+        "INSTAGRAM_HANDLE": app.config.get("INSTAGRAM_HANDLE", ""),
+        "INSTAGRAM_URL": app.config.get("INSTAGRAM_URL", ""),
+        "FACEBOOK_URL": app.config.get("FACEBOOK_URL", ""),
+        "mailto_link": mailto_link,
+        "gmail_compose_link": gmail_compose_link,
+    })
+
     @app.context_processor
     def inject_globals():
-        return {
-            "SITE_NAME": app.config["SITE_NAME"],
-            "BRAND": app.config["BRAND"],
-            "CONTACT_EMAIL": app.config["CONTACT_EMAIL"],
-            "CONTACT_PHONE": app.config["CONTACT_PHONE"],
-            "INSTAGRAM_HANDLE": app.config.get("INSTAGRAM_HANDLE", ""),
-            "INSTAGRAM_URL": app.config.get("INSTAGRAM_URL", ""),
-            "FACEBOOK_URL": app.config.get("FACEBOOK_URL", ""),
-            "is_admin": is_admin(),
-            "mailto_link": mailto_link,
-            "gmail_compose_link": gmail_compose_link,
-            "CURRENT_YEAR": datetime.utcnow().year,
-        }
+        return {**static_globals, "is_admin": is_admin(), "CURRENT_YEAR": current_year()}
 
     return app
 
+# -------------------- Lead pagination --------------------
+LEAD_COUNT_TTL = 60.0
+
+
+def parse_lead_cursor(raw: str):
+    """"<created_at>,<id>" -> (created_at, id); None if missing or malformed."""
+    created_at, sep, lead_id = (raw or "").rpartition(",")
+    if not sep or not created_at:
+        return None
+    try:
+        return (created_at, int(lead_id))
+    except ValueError:
+        return None
+
+
+# -------------------- View cache --------------------
+# Public pages change only when an admin edits clinics (or geocoding fills in
+# coordinates), so their responses are kept in a per-app dict for a short
+# while. Pages that list clinics key their entries by clinics_rev, so a write
+# made by another worker is picked up on the next request.
+VIEW_CACHE_MAX_ENTRIES = 256
+
+
+def cached_view(timeout: int, query_string: bool = False, version=None):
+    """Cache successful responses of a GET view for `timeout` seconds.
+
+    The key is the endpoint, the admin flag (the layout differs for admins),
+    with `query_string` the raw query string, and with `version` the value
+    that callable returns (e.g. the clinics revision).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Flashed messages are consumed by this render; never cache it.
+            if session.get("_flashes"):
+                return view(*args, **kwargs)
+            cache = current_app.extensions["view_cache"]
+            key = (
+                request.endpoint,
+                bool(session.get("is_admin")),
+                request.query_string if query_string else b"",
+                version() if version else None,
+            )
+            now = time.monotonic()
+            hit = cache.get(key)
+            if hit is None or hit[0] <= now:
+                resp = current_app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200 or resp.direct_passthrough:
+                    return resp
+                if len(cache) >= VIEW_CACHE_MAX_ENTRIES:
+                    cache.clear()
+                body = resp.get_data()
+                # Compressed once here, so hits don't re-run gzip per request.
+                gz = gzip_body(body) if resp.mimetype in GZIP_MIMETYPES else None
+                cache[key] = (now + timeout, body, list(resp.headers.items()), gz)
+                return _with_cached_gzip(resp, gz)
+            _expires, body, headers, gz = hit
+            resp = _with_cached_gzip(current_app.response_class(body, headers=headers), gz)
+            return resp.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def clear_view_cache() -> None:
+    current_app.extensions["view_cache"].clear()
+
+
+def invalidate_clinics() -> None:
+    """Run by the clinic write helpers after they commit.
+
+    Everything clinic-derived is keyed by clinics_rev, which the triggers bump
+    in every worker; this only frees this process's now-unreachable views.
+    """
+    clear_view_cache()
+
+
+# -------------------- Compression --------------------
+# Rendered pages and JSON are gzip-compressed in after_request. Static files
+# are streamed (direct_passthrough) and left alone.
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+GZIP_MIN_SIZE = 500
+GZIP_MIMETYPES = frozenset({
+    "text/html", "text/css", "text/plain", "application/json",
+    "application/javascript", "text/javascript", "image/svg+xml",
+})
+
+
+def gzip_response(resp):
+    resp.vary.add("Accept-Encoding")
+    if (
+        resp.status_code != 200
+        or resp.direct_passthrough
+        or "Content-Encoding" in resp.headers
+        or resp.mimetype not in GZIP_MIMETYPES
+        or "gzip" not in request.accept_encodings
+    ):
+        return resp
+    gz = gzip_body(resp.get_data())
+    if gz is None:
+        return resp
+    return _set_gzip_body(resp, gz)
+
+
+def gzip_body(data: bytes) -> Optional[bytes]:
+    """Compressed `data`, or None when it is too small to be worth it."""
+    if len(data) < GZIP_MIN_SIZE:
+        return None
+    return gzip.compress(data, compresslevel=6)
+
+
+def _set_gzip_body(resp, gz: bytes):
+    resp.set_data(gz)
+    resp.headers["Content-Encoding"] = "gzip"
+    # Same resource, different bytes: keep If-None-Match working, weakly.
+    etag, weak = resp.get_etag()
+    if etag and not weak:
+        resp.set_etag(etag, weak=True)
+    return resp
+
+
+def _with_cached_gzip(resp, gz: Optional[bytes]):
+    """Use the view cache's precompressed body when the client accepts gzip."""
+    if gz is not None and "gzip" in request.accept_encodings:
+        _set_gzip_body(resp, gz)
+    return resp
+
+
 # -------------------- DB --------------------
+# Each app holds one writer connection plus a small pool of read-only
+# connections (WAL lets readers run alongside the writer). PRAGMAs are applied
+# once per connection instead of once per request. The writer runs in
+# autocommit mode and is shared between threads, so whoever uses it holds
+# `writer_lock`: get_db() takes it for the rest of the app context.
+DB_READERS = 4
+_READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _configure_connection(db: sqlite3.Connection) -> sqlite3.Connection:
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA busy_timeout=5000;")
+    db.execute("PRAGMA cache_size=-65536;")
+    db.execute("PRAGMA temp_store=MEMORY;")
+    # Map the database file so hot pages are read straight from the OS cache.
+    db.execute("PRAGMA mmap_size=268435456;")
+    db.execute("PRAGMA foreign_keys=ON;")
+    return db
+
+
+def open_sqlite_pool(db_path: str) -> SimpleNamespace:
+    writer = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    _configure_connection(writer)
+    # Improve concurrency for multi-request workloads.
+    try:
+        writer.execute("PRAGMA journal_mode=WAL;")
+        writer.execute("PRAGMA synchronous=NORMAL;")
+    except Exception:
+        pass
+    return SimpleNamespace(
+        path=db_path,
+        writer=writer,
+        writer_lock=threading.RLock(),
+        readers=queue.Queue(maxsize=DB_READERS),
+    )
+
+
+def checkout_reader(pool: SimpleNamespace) -> sqlite3.Connection:
+    """Take an idle read-only connection, opening a new one if all are busy."""
+    try:
+        return pool.readers.get_nowait()
+    except queue.Empty:
+        uri = f"file:{quote(pool.path)}?mode=ro"
+        return _configure_connection(sqlite3.connect(uri, uri=True, check_same_thread=False))
+
+
+def checkin_reader(pool: SimpleNamespace, db: sqlite3.Connection) -> None:
+    try:
+        pool.readers.put_nowait(db)
+    except queue.Full:
+        db.close()
+
+
 def get_db():
-    db = getattr(g, "_db", None)
+    """Return the connection for the current context.
+
+    Read-only requests (GET/HEAD) get a pooled read-only connection, everything
+    else (POST handlers, init_db, background work) uses the shared writer and
+    holds its lock until the app context ends. Keep background app contexts
+    short for that reason.
+    """
+    db = g.get("db")
     if db is None:
-        db_path = current_app.config.get("DB_PATH")
-        db = sqlite3.connect(db_path, check_same_thread=False)
-        db.row_factory = sqlite3.Row
-        # Improve concurrency for multi-request workloads.
-        try:
-            db.execute("PRAGMA journal_mode=WAL;")
-            db.execute("PRAGMA synchronous=NORMAL;")
-        except Exception:
-            pass
-        g._db = db
+        pool = current_app.extensions["sqlite"]
+        if has_request_context() and request.method in _READ_METHODS:
+            db = checkout_reader(pool)
+            g.db_is_reader = True
+        else:
+            pool.writer_lock.acquire()
+            db = pool.writer
+        g.db = db
     return db
 
+
+@contextmanager
+def write_transaction():
+    """Run the block as one `BEGIN IMMEDIATE ... COMMIT` on the writer.
+
+    Batches many statements into a single WAL commit; rolls back on error.
+    """
+    pool = current_app.extensions["sqlite"]
+    with pool.writer_lock:
+        db = pool.writer
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+# Bump when _create_schema() changes; stored in PRAGMA user_version so that
+# regular restarts skip the DDL entirely.
+SCHEMA_VERSION = 5
+
+
 def init_db():
     db = get_db()
+    if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        with write_transaction():
+            _create_schema(db)
+            db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    # Ensure the public "Autoryzowane Gabinety" list is present.
+    # This replaces any demo/ambassador content and keeps only the official list.
+    sync_official_clinics(db)
+
+
+def _create_schema(db):
     db.execute("""
         CREATE TABLE IF NOT EXISTS clinics(
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -684,14 +1167,83 @@ def init_db():
             created_at TEXT NOT NULL
         )
     """)
-    db.commit()
-
-    # Ensure the public "Autoryzowane Gabinety" list is present.
-    # This replaces any demo/ambassador content and keeps only the official list.
-    sync_official_clinics(db)
-
-
-def official_clinics_list():
+    # Listings ORDER BY `city IS NULL, city, name` (blank cities last). Indexing
+    # that exact expression lets SQLite walk the index instead of sorting (v3;
+    # replaces ix_clinics_kind_city_name).
+    db.execute("CREATE INDEX IF NOT EXISTS ix_clinics_city_order ON clinics(city IS NULL, city, name)")
+    db.execute("CREATE INDEX IF NOT EXISTS ix_clinics_kind_city_order ON clinics(kind, city IS NULL, city, name)")
+    db.execute("DROP INDEX IF EXISTS ix_clinics_kind_city_name")
+    # (name, address) identifies a clinic (v4): keep the oldest of any
+    # duplicates, then enforce it so inserts can use ON CONFLICT.
+    db.execute("DELETE FROM clinics WHERE id NOT IN (SELECT MIN(id) FROM clinics GROUP BY name, address)")
+    db.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_clinics_name_address ON clinics(name, address)")
+    db.execute("DROP INDEX IF EXISTS ix_clinics_name_address")
+    # Clinic searches are substring matches (FTS / LIKE '%q%'), which no
+    # b-tree index serves (v5).
+    db.execute("DROP INDEX IF EXISTS ix_clinics_name_nocase")
+    # Matches the notifications ORDER BY exactly (v2; replaces ix_leads_created_at).
+    db.execute("CREATE INDEX IF NOT EXISTS ix_leads_created ON leads(created_at DESC, id DESC)")
+    db.execute("DROP INDEX IF EXISTS ix_leads_created_at")
+    init_clinics_fts(db)
+
+    # Revision counter bumped by triggers on every clinics write; used as a
+    # cheap, exact cache key for clinic listings (also across workers).
+    db.execute("CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value)")
+    db.execute("INSERT OR IGNORE INTO meta(key, value) VALUES('clinics_rev', 0)")
+    for event, name in (("INSERT", "ai"), ("UPDATE", "au"), ("DELETE", "ad")):
+        db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS clinics_rev_{name} AFTER {event} ON clinics BEGIN
+                UPDATE meta SET value = value + 1 WHERE key = 'clinics_rev';
+            END
+        """)
+
+
+def init_clinics_fts(db):
+    """Create the full-text index used by `search_clinics` (best-effort).
+
+    The trigram tokenizer matches arbitrary substrings of 3+ characters, so a
+    MATCH on it answers the same question as `LIKE '%q%'` without scanning the
+    whole table. External-content triggers keep it in sync with `clinics`.
+    Requires SQLite with FTS5 (3.34+ for trigram); otherwise search keeps
+    using LIKE.
+    """
+    exists = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='clinics_fts'"
+    ).fetchone()
+    try:
+        db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS clinics_fts USING fts5(
+                name, address, city,
+                content='clinics', content_rowid='id', tokenize='trigram'
+            )
+        """)
+        db.execute("""
+            CREATE TRIGGER IF NOT EXISTS clinics_fts_ai AFTER INSERT ON clinics BEGIN
+                INSERT INTO clinics_fts(rowid, name, address, city)
+                VALUES (new.id, new.name, new.address, new.city);
+            END
+        """)
+        db.execute("""
+            CREATE TRIGGER IF NOT EXISTS clinics_fts_ad AFTER DELETE ON clinics BEGIN
+                INSERT INTO clinics_fts(clinics_fts, rowid, name, address, city)
+                VALUES ('delete', old.id, old.name, old.address, old.city);
+            END
+        """)
+        db.execute("""
+            CREATE TRIGGER IF NOT EXISTS clinics_fts_au AFTER UPDATE ON clinics BEGIN
+                INSERT INTO clinics_fts(clinics_fts, rowid, name, address, city)
+                VALUES ('delete', old.id, old.name, old.address, old.city);
+                INSERT INTO clinics_fts(rowid, name, address, city)
+                VALUES (new.id, new.name, new.address, new.city);
+            END
+        """)
+        if not exists:
+            db.execute("INSERT INTO clinics_fts(clinics_fts) VALUES('rebuild')")
+    except sqlite3.OperationalError as exc:
+        print(f"[WARN] Clinic full-text index unavailable, search uses LIKE: {exc}")
+
+
+def _build_official_clinics():
     """Canonical list for the public map.
 
     We keep two categories:
@@ -939,6 +1491,54 @@ def official_clinics_list():
     ]
 
 
+@lru_cache(maxsize=512)
+def _nk(s):
+    """Stripped, interned key component (repeat syncs reuse the same strings)."""
+    return sys.intern((s or "").strip())
+
+
+def _official_key(c):
+    """Identity of an official entry: (name, address, city, phone), stripped."""
+    return (_nk(c.get("name")), _nk(c.get("address")), _nk(c.get("city")), _nk(c.get("phone")))
+
+
+# The official list is static, so it is built (and keyed) once at import.
+_OFFICIAL_CLINICS = tuple(MappingProxyType(c) for c in _build_official_clinics())
+_OFFICIAL_BY_KEY = {_official_key(c): c for c in _OFFICIAL_CLINICS}
+_OFFICIAL_FINGERPRINT = hashlib.sha256(
+    json.dumps([dict(c) for c in _OFFICIAL_CLINICS], sort_keys=True, ensure_ascii=False).encode("utf-8")
+).hexdigest()
+
+
+def official_clinics_list():
+    return _OFFICIAL_CLINICS
+
+
+# Clinic statements shared by the admin form, bulk import and the official
+# list sync. Keeping one text per statement lets sqlite3's per-connection
+# statement cache compile each of them once.
+_SQL_INSERT_CLINIC = (
+    "INSERT INTO clinics(kind,name,address,city,phone,website,notes,lat,lon,created_at,updated_at) "
+    "VALUES(?,?,?,?,?,?,?,?,?,?,?)"
+)
+# New clinics from the admin form and bulk import: an existing (name, address)
+# is updated in place, keeping its id, created_at and known coordinates.
+_SQL_UPSERT_CLINIC = _SQL_INSERT_CLINIC + (
+    " ON CONFLICT(name, address) DO UPDATE SET"
+    " kind=excluded.kind, city=excluded.city, phone=excluded.phone,"
+    " website=excluded.website, notes=excluded.notes,"
+    " lat=COALESCE(excluded.lat, clinics.lat), lon=COALESCE(excluded.lon, clinics.lon),"
+    " updated_at=excluded.updated_at"
+)
+_SQL_UPDATE_CLINIC = (
+    "UPDATE clinics SET kind=?,name=?,address=?,city=?,phone=?,website=?,notes=?,lat=?,lon=?,updated_at=? "
+    "WHERE id=?"
+)
+_SQL_IMPORT_UPDATE_CLINIC = "UPDATE clinics SET kind=?,city=?,phone=?,website=?,notes=?,updated_at=? WHERE id=?"
+_SQL_SET_CLINIC_COORDS = "UPDATE clinics SET lat=?, lon=?, updated_at=? WHERE id=?"
+_SQL_CLINIC_KEYS = "SELECT id, name, address, lat, lon FROM clinics"
+
+
 def sync_official_clinics(db):
     """Synchronize the clinics table with the official list.
 
@@ -946,97 +1546,66 @@ def sync_official_clinics(db):
     - Keep *only* entries present in `official_clinics_list()`.
     - Enforce the exact `kind` (ambassadors/authorized) from the official list.
     - Best-effort geocode missing coordinates (cached in `geocode_cache`).
+
+    A completed sync stores the list fingerprint plus the clinics revision it
+    left behind in `meta`; while both still match and no clinic lacks
+    coordinates there is nothing to do, so restarts skip the sync.
     """
-    try:
-        rows = db.execute("SELECT id, kind, name, address, city, phone, lat, lon FROM clinics").fetchall()
-    except Exception:
+    if _official_sync_is_current(db):
         return
 
-    official = official_clinics_list()
-    allowed_keys = set(
-        (
-            (c.get("name", "") or "").strip(),
-            (c.get("address", "") or "").strip(),
-            (c.get("city", "") or "").strip(),
-            (c.get("phone", "") or "").strip(),
-        )
-        for c in official
-    )
-
-    # Map key -> desired kind (so we can enforce categories).
-    desired_kind = {
-        (
-            (c.get("name", "") or "").strip(),
-            (c.get("address", "") or "").strip(),
-            (c.get("city", "") or "").strip(),
-            (c.get("phone", "") or "").strip(),
-        ): (c.get("kind") or "authorized")
-        for c in official
-    }
-
-    
-    desired_coords = {
-        (
-            (c.get("name", "") or "").strip(),
-            (c.get("address", "") or "").strip(),
-            (c.get("city", "") or "").strip(),
-            (c.get("phone", "") or "").strip(),
-        ): (c.get("lat"), c.get("lon"))
-        for c in official
-    }
+    # Everything below runs as one transaction (a single WAL commit). Taking
+    # the write lock before reading also keeps concurrently starting workers
+    # from syncing the same rows twice.
+    with write_transaction():
+        try:
+            rows = db.execute("SELECT id, kind, name, address, city, phone, lat, lon FROM clinics").fetchall()
+        except Exception:
+            return
 
-    existing_keys = set()
-    to_delete_ids = []
-    for r in rows:
-        key = (
-            (r["name"] or "").strip(),
-            (r["address"] or "").strip(),
-            (r["city"] or "").strip(),
-            (r["phone"] or "").strip(),
-        )
-        if key in allowed_keys:
-            existing_keys.add(key)
-            # Enforce official kind + coordinates.
-            want = desired_kind.get(key, "authorized")
-            latlon = desired_coords.get(key)
-            want_lat = latlon[0] if latlon else None
-            want_lon = latlon[1] if latlon else None
-
-            need_kind = (r["kind"] != want)
-            need_coords = (want_lat is not None and want_lon is not None and (r["lat"] != want_lat or r["lon"] != want_lon))
-
-            if need_kind or need_coords:
-                db.execute(
-                    "UPDATE clinics SET kind=?, lat=?, lon=?, updated_at=? WHERE id=?",
-                    (
+        now = utc_now_iso()  # one timestamp for the whole sync
+        existing_keys = set()
+        updates = []
+        to_delete_ids = []
+        for r in rows:
+            key = (_nk(r["name"]), _nk(r["address"]), _nk(r["city"]), _nk(r["phone"]))
+            c = _OFFICIAL_BY_KEY.get(key)
+            if c is not None:
+                existing_keys.add(key)
+                # Enforce official kind + coordinates.
+                want = c.get("kind") or "authorized"
+                want_lat = c.get("lat")
+                want_lon = c.get("lon")
+
+                need_kind = (r["kind"] != want)
+                need_coords = (want_lat is not None and want_lon is not None and (r["lat"] != want_lat or r["lon"] != want_lon))
+
+                if need_kind or need_coords:
+                    updates.append((
                         want,
                         want_lat if want_lat is not None else r["lat"],
                         want_lon if want_lon is not None else r["lon"],
-                        datetime.utcnow().isoformat(timespec="seconds"),
+                        now,
                         r["id"],
-                    ),
-                )
-        else:
-            # Remove any non-official entries, including ambassadors/demo.
-            to_delete_ids.append(r["id"])
-
-    if to_delete_ids:
-        db.executemany("DELETE FROM clinics WHERE id=?", [(i,) for i in to_delete_ids])
-
-    now = datetime.utcnow().isoformat(timespec="seconds")
-    for c in official:
-        key = (
-            (c.get("name", "") or "").strip(),
-            (c.get("address", "") or "").strip(),
-            (c.get("city", "") or "").strip(),
-            (c.get("phone", "") or "").strip(),
-        )
-        if key in existing_keys:
-            continue
-        db.execute(
-            """INSERT INTO clinics(kind,name,address,city,phone,website,notes,lat,lon,created_at,updated_at)
-               VALUES(?,?,?,?,?,?,?,?,?,?,?)""",
-            (
+                    ))
+            else:
+                # Remove any non-official entries, including ambassadors/demo.
+                to_delete_ids.append(r["id"])
+
+        db.executemany("UPDATE clinics SET kind=?, lat=?, lon=?, updated_at=? WHERE id=?", updates)
+        # The ids travel as one JSON array, so the statement text (and its
+        # cached plan) is the same whatever the number of ids.
+        if to_delete_ids:
+            db.execute(
+                "DELETE FROM clinics WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(to_delete_ids),),
+            )
+
+        inserts = []
+        for key, c in _OFFICIAL_BY_KEY.items():
+            if key in existing_keys:
+                continue
+            inserts.append((
                 (c.get("kind") or "authorized"),
                 c["name"].strip(),
                 c["address"].strip(),
@@ -1048,72 +1617,146 @@ def sync_official_clinics(db):
                 c.get("lon"),
                 now,
                 now,
-            ),
+            ))
+        db.executemany(_SQL_INSERT_CLINIC, inserts)
+
+        # Best-effort: geocode all official entries that do not have coordinates yet.
+        # One lookup per distinct address; clinics sharing it are updated together.
+        try:
+            missing = db.execute(
+                "SELECT DISTINCT address FROM clinics WHERE lat IS NULL OR lon IS NULL"
+            ).fetchall()
+            found = []
+            for r in missing:
+                lat, lon = geocode_address(r["address"])
+                if lat and lon:
+                    found.append((lat, lon, now, r["address"]))
+            db.executemany(
+                "UPDATE clinics SET lat=?, lon=?, updated_at=? "
+                "WHERE address=? AND (lat IS NULL OR lon IS NULL)",
+                found,
+            )
+        except Exception as _exc:
+            print(f"[WARN] Geocode sync failed: {_exc}")
+
+        db.execute(
+            "INSERT INTO meta(key, value) VALUES('official_sync', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            (f"{_OFFICIAL_FINGERPRINT}:{clinics_version(db)}",),
         )
+    invalidate_clinics()
 
-    db.commit()
 
-    # Best-effort: geocode all official entries that do not have coordinates yet.
-    try:
-        rows = db.execute("SELECT id, address, lat, lon FROM clinics").fetchall()
-        for r in rows:
-            if r["lat"] and r["lon"]:
-                continue
-            lat, lon = geocode_address(r["address"])
-            if lat and lon:
-                db.execute(
-                    "UPDATE clinics SET lat=?, lon=?, updated_at=? WHERE id=?",
-                    (lat, lon, datetime.utcnow().isoformat(timespec="seconds"), r["id"]),
-                )
-        db.commit()
-    except Exception as _exc:
-        print(f"[WARN] Geocode sync failed: {_exc}")
+def _official_sync_is_current(db) -> bool:
+    row = db.execute("SELECT value FROM meta WHERE key='official_sync'").fetchone()
+    if row is None or row[0] != f"{_OFFICIAL_FINGERPRINT}:{clinics_version(db)}":
+        return False
+    # Addresses without coordinates are re-queued on every start.
+    return db.execute("SELECT 1 FROM clinics WHERE lat IS NULL OR lon IS NULL LIMIT 1").fetchone() is None
 
 def row_to_dict(row):
-    if row is None: return None
-    return {k: row[k] for k in row.keys()}
+    return None if row is None else dict(row)
+
+def rows_to_dicts(rows):
+    """Plain dicts (JSON-serializable); column names are read once per result."""
+    if not rows:
+        return []
+    keys = rows[0].keys()
+    return [dict(zip(keys, r)) for r in rows]
 
 def get_clinic(cid: int):
     db = get_db()
     row = db.execute("SELECT * FROM clinics WHERE id=?", (cid,)).fetchone()
     return row_to_dict(row)
 
+def clinics_version(db) -> int:
+    """Current clinics revision (see the `meta` triggers in init_db)."""
+    return db.execute("SELECT value FROM meta WHERE key='clinics_rev'").fetchone()[0]
+
+
+@lru_cache(maxsize=32)
+def cached_search_clinics(view, q, limit, version):
+    """search_clinics() memoized per clinics revision.
+
+    The result is shared between requests and must not be mutated.
+    """
+    return search_clinics(view=view, q=q, limit=limit)
+
+
+@lru_cache(maxsize=16)
+def clinics_json(view, q, version):
+    """Serialized /api/clinics body for a clinics revision."""
+    clinics = cached_search_clinics(view, q, 2000, version)
+    # Compact UTF-8 (no key sorting, no \uXXXX escapes for Polish letters).
+    return json.dumps({"clinics": clinics}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def clinics_etag(view, q, version) -> str:
+    """ETag for /api/clinics: the revision identifies the data, view/q the slice."""
+    return hashlib.blake2b(f"{version}|{view}|{q}".encode("utf-8"), digest_size=8).hexdigest()
+
+
+# Trigram FTS cannot match queries shorter than one trigram.
+FTS_MIN_QUERY = 3
+
+
+def like_contains(q: str) -> str:
+    """`%q%` for `LIKE ? ESCAPE '\\'`; `%`, `_` and `\\` in `q` match literally."""
+    return "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# `view` values that filter by clinic kind; anything else lists all clinics.
+_VIEW_KINDS = {"authorized": "authorized", "ambassadors": "ambassadors"}
+SEARCH_MAX_LIMIT = 5000
+
+# The unfiltered listing (every public page load) skips query assembly.
+_SQL_ALL_CLINICS = "SELECT * FROM clinics ORDER BY city IS NULL, city, name LIMIT ?"
+
+
 def search_clinics(view="all", q="", limit=500):
     db = get_db()
+    limit = max(0, min(int(limit), SEARCH_MAX_LIMIT))
+    if not q and view not in _VIEW_KINDS:
+        return rows_to_dicts(db.execute(_SQL_ALL_CLINICS, (limit,)).fetchall())
+    if q and len(q) >= FTS_MIN_QUERY:
+        try:
+            return _search_clinics(db, view, q, limit, use_fts=True)
+        except sqlite3.OperationalError:
+            pass  # No FTS5 in this SQLite build; fall back to LIKE.
+    return _search_clinics(db, view, q, limit, use_fts=False)
+
+def _search_clinics(db, view, q, limit, use_fts):
     where = []
     params = []
-    if view == "authorized":
+    kind = _VIEW_KINDS.get(view)
+    if kind:
         where.append("kind=?")
-        params.append("authorized")
-    elif view == "ambassadors":
-        where.append("kind=?")
-        params.append("ambassadors")
-    elif view == "ambassadors":
-        where.append("kind=?")
-        params.append("ambassadors")
-    if q:
-        where.append("(name LIKE ? OR address LIKE ? OR city LIKE ?)")
-        qq = f"%{q}%"
+        params.append(kind)
+    if q and use_fts:
+        # Quoted as a single phrase: substring match across name/address/city.
+        where.append("id IN (SELECT rowid FROM clinics_fts WHERE clinics_fts MATCH ?)")
+        params.append('"' + q.replace('"', '""') + '"')
+    elif q:
+        where.append("(name LIKE ? ESCAPE '\\' OR address LIKE ? ESCAPE '\\' OR city LIKE ? ESCAPE '\\')")
+        qq = like_contains(q)
         params.extend([qq, qq, qq])
     sql = "SELECT * FROM clinics"
     if where:
         sql += " WHERE " + " AND ".join(where)
     sql += " ORDER BY city IS NULL, city, name LIMIT ?"
     params.append(limit)
-    rows = db.execute(sql, params).fetchall()
-    return [row_to_dict(r) for r in rows]
+    return rows_to_dicts(db.execute(sql, params).fetchall())
 
 def upsert_clinic(cid, data, geocode_if_missing=True):
-    now = datetime.utcnow().isoformat(timespec="seconds")
+    now = utc_now_iso()
     db = get_db()
     if geocode_if_missing and (not data.get("lat") or not data.get("lon")):
         lat, lon = geocode_address(data.get("address", ""))
         if lat and lon:
             data["lat"], data["lon"] = lat, lon
     if cid is None:
-        cur = db.execute(
-            """INSERT INTO clinics(kind,name,address,city,phone,website,notes,lat,lon,created_at,updated_at)
-               VALUES(?,?,?,?,?,?,?,?,?,?,?)""",
+        db.execute(
+            _SQL_UPSERT_CLINIC,
             (
                 data["kind"], data["name"], data["address"], data.get("city",""),
                 data.get("phone",""), data.get("website",""), data.get("notes",""),
@@ -1121,11 +1764,14 @@ def upsert_clinic(cid, data, geocode_if_missing=True):
             )
         )
         db.commit()
-        return cur.lastrowid
+        invalidate_clinics()
+        # lastrowid is not set when the upsert took the UPDATE branch.
+        return db.execute(
+            "SELECT id FROM clinics WHERE name=? AND address=?", (data["name"], data["address"])
+        ).fetchone()[0]
     else:
         db.execute(
-            """UPDATE clinics SET kind=?,name=?,address=?,city=?,phone=?,website=?,notes=?,lat=?,lon=?,updated_at=?
-               WHERE id=?""",
+            _SQL_UPDATE_CLINIC,
             (
                 data["kind"], data["name"], data["address"], data.get("city",""),
                 data.get("phone",""), data.get("website",""), data.get("notes",""),
@@ -1133,54 +1779,224 @@ def upsert_clinic(cid, data, geocode_if_missing=True):
             )
         )
         db.commit()
+        invalidate_clinics()
         return cid
 
+def delete_clinic(cid):
+    db = get_db()
+    db.execute("DELETE FROM clinics WHERE id=?", (cid,))
+    db.commit()
+    invalidate_clinics()
+
+def _form(key, default=""):
+    """Stripped form value ('' when missing or empty)."""
+    return (request.form.get(key, default) or "").strip()
+
+def _float_or_none(value: str):
+    try:
+        return float(value.replace(",", ".")) if value else None
+    except ValueError:
+        return None
+
 def clinic_from_form():
-    def f(key, default=""):
-        return (request.form.get(key, default) or "").strip()
-    lat = f("lat")
-    lon = f("lon")
+    # One pass over the submitted form instead of a MultiDict lookup per field.
+    form = {k: (v or "").strip() for k, v in request.form.items()}
+    get = form.get
     return {
-        "kind": f("kind", "authorized") or "authorized",
-        "name": f("name"),
-        "address": f("address"),
-        "city": f("city"),
-        "phone": f("phone"),
-        "website": f("website"),
-        "notes": f("notes"),
-        "lat": float(lat) if lat else None,
-        "lon": float(lon) if lon else None,
+        "kind": get("kind") or "authorized",
+        "name": get("name", ""),
+        "address": get("address", ""),
+        "city": get("city", ""),
+        "phone": get("phone", ""),
+        "website": get("website", ""),
+        "notes": get("notes", ""),
+        # Unparseable coordinates are dropped (and geocoded) rather than a 500.
+        "lat": _float_or_none(get("lat", "")),
+        "lon": _float_or_none(get("lon", "")),
     }
 
 # -------------------- Geocoding --------------------
+# Nominatim lookups never run on the request path. geocode_address() answers
+# from `geocode_cache` and queues misses for a single background worker,
+# which enforces Nominatim's 1 request/second policy, stores the results in the
+# cache and fills in coordinates of every clinic with that address. Results
+# are written in batches (up to GEOCODE_FLUSH_SIZE rows or
+# GEOCODE_FLUSH_INTERVAL seconds per transaction).
+# Failed lookups are cached too, but only for GEOCODE_NEGATIVE_TTL, so a
+# transient outage does not poison an address forever.
+GEOCODE_MIN_INTERVAL = 1.0
+GEOCODE_NEGATIVE_TTL = 24 * 3600  # seconds
+GEOCODE_FLUSH_SIZE = 50
+GEOCODE_FLUSH_INTERVAL = 2.0
+# Positive results are also memoized per app (normalized address ->
+# (lat, lon)), so repeated addresses skip SQLite; the oldest entries are
+# evicted first. clear_geocode_memo() empties it.
+GEOCODE_MEMO_SIZE = 4096
+
+# Constant statement text, so SQLite's statement cache reuses the plan.
+_SQL_GEOCODE_LOOKUP = "SELECT lat, lon, updated_at FROM geocode_cache WHERE address=?"
+
+_geocode_queue: queue.Queue = queue.Queue(maxsize=1000)
+_geocode_pending: set = set()  # addresses queued or in flight (single-flight)
+# address -> ids of clinics whose existing coordinates the result replaces
+# (explicit admin requests; normally only clinics without coordinates are filled).
+_geocode_overwrite: dict = {}
+_geocode_lock = threading.Lock()
+_geocode_thread: Optional[threading.Thread] = None
+
+# Keep-alive session: repeated lookups reuse one TCP/TLS connection.
+_nominatim = requests.Session()
+_nominatim.headers.update({"User-Agent": NOMINATIM_USER_AGENT, "Accept-Language": "pl"})
+_nominatim.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+))
+
+
 def geocode_address(address: str):
+    """Return cached (lat, lon) for `address`.
+
+    On a cache miss (or an expired negative entry) a background lookup is
+    queued and (None, None) is returned right away.
+    """
     address = (address or "").strip()
     if not address:
         return (None, None)
+    cached = lookup_geocode_cache(get_db(), address)
+    if cached is None:
+        request_geocode(address)
+        return (None, None)
+    return cached
+
+
+def lookup_geocode_cache(db, address: str):
+    """Return cached (lat, lon), (None, None) for a fresh negative entry, or None on a miss."""
+    memo = current_app.extensions["geocode_memo"]
+    hit = memo.get(_geocode_memo_key(address))
+    if hit is not None:
+        return hit
+    row = db.execute(_SQL_GEOCODE_LOOKUP, (address,)).fetchone()
+    if row is None:
+        return None
+    if row["lat"] and row["lon"]:
+        _memo_geocode(memo, address, (row["lat"], row["lon"]))
+        return (row["lat"], row["lon"])
+    expires = time.strftime(_ISO_FORMAT, time.gmtime(time.time() - GEOCODE_NEGATIVE_TTL))
+    if (row["updated_at"] or "") < expires:
+        return None
+    return (None, None)
+
+
+def _geocode_memo_key(address: str) -> str:
+    # Nominatim ignores case and extra whitespace, so such variants share an entry.
+    return " ".join(address.lower().split())
+
+
+def _memo_geocode(memo: dict, address: str, coords) -> None:
+    key = _geocode_memo_key(address)
+    memo.pop(key, None)
+    if len(memo) >= GEOCODE_MEMO_SIZE:
+        del memo[next(iter(memo))]
+    memo[key] = coords
 
+
+def clear_geocode_memo() -> None:
+    current_app.extensions["geocode_memo"].clear()
+
+
+def request_geocode(address: str, overwrite_id: Optional[int] = None) -> bool:
+    """Queue a background lookup for `address`; duplicates are coalesced.
+
+    With `overwrite_id`, a positive result also replaces the coordinates that
+    clinic already has. Returns False only when the queue is full.
+    """
+    address = (address or "").strip()
+    if not address:
+        return False
+    app = current_app._get_current_object()
+    global _geocode_thread
+    with _geocode_lock:
+        if address not in _geocode_pending:
+            try:
+                _geocode_queue.put_nowait((app, address))
+            except queue.Full:
+                return False
+            _geocode_pending.add(address)
+        if overwrite_id is not None:
+            _geocode_overwrite.setdefault(address, set()).add(overwrite_id)
+        if _geocode_thread is None or not _geocode_thread.is_alive():
+            _geocode_thread = threading.Thread(target=_geocode_worker, name="geocode", daemon=True)
+            _geocode_thread.start()
+    return True
+
+
+def geocode_pending(address: str) -> bool:
+    """True while a lookup for `address` is queued or its result not yet stored."""
+    with _geocode_lock:
+        return (address or "").strip() in _geocode_pending
+
+
+def _geocode_worker() -> None:
+    last_call = 0.0
+    batch = []  # (app, address, lat, lon, updated_at)
+    batch_started = 0.0
+    while True:
+        timeout = None
+        if batch:
+            timeout = max(0.0, GEOCODE_FLUSH_INTERVAL - (time.monotonic() - batch_started))
+        try:
+            app, address = _geocode_queue.get(timeout=timeout)
+        except queue.Empty:
+            _flush_geocode_results(batch)
+            batch = []
+            continue
+
+        wait = GEOCODE_MIN_INTERVAL - (time.monotonic() - last_call)
+        if wait > 0:
+            time.sleep(wait)
+        lat, lon = _nominatim_search(address)
+        last_call = time.monotonic()
+
+        if not batch:
+            batch_started = last_call
+        batch.append((app, address, lat, lon, utc_now_iso()))
+        if len(batch) >= GEOCODE_FLUSH_SIZE or last_call - batch_started >= GEOCODE_FLUSH_INTERVAL:
+            _flush_geocode_results(batch)
+            batch = []
+
+
+def _flush_geocode_results(batch) -> None:
+    by_app = {}
+    with _geocode_lock:
+        overwrite = {address: set(_geocode_overwrite.get(address, ())) for _app, address, *_rest in batch}
+    for app, address, lat, lon, ts in batch:
+        by_app.setdefault(app, []).append((address, lat, lon, ts))
+    for app, rows in by_app.items():
+        try:
+            with app.app_context():
+                _save_geocode_cache(rows, overwrite)
+        except Exception as exc:
+            print(f"[WARN] Failed to store {len(rows)} geocoding result(s): {exc}")
+    # Addresses stay "pending" until their result is visible in the cache.
+    with _geocode_lock:
+        for _app, address, *_rest in batch:
+            _geocode_pending.discard(address)
+            _geocode_overwrite.pop(address, None)
+    for _item in batch:
+        _geocode_queue.task_done()
+
+
+def _nominatim_search(address: str):
+    """Resolve `address` via Nominatim; (None, None) when not found or on error."""
     # Improve hit-rate: if user provided a partial address, bias search to Poland.
     if "polska" not in address.lower() and "poland" not in address.lower():
         address_q = f"{address}, Polska"
     else:
         address_q = address
 
-    db = get_db()
-    cached = db.execute("SELECT lat, lon FROM geocode_cache WHERE address=?", (address,)).fetchone()
-    if cached and cached["lat"] and cached["lon"]:
-        return (cached["lat"], cached["lon"])
-
-    # Polite Nominatim usage: one request per second and a valid UA.
-    # IMPORTANT: prefer app config over env vars so the default UA configured
-    # in create_app() is actually used in production.
-    time.sleep(1.0)
     try:
-        ua = (
-            (current_app.config.get("NOMINATIM_USER_AGENT") if current_app else "")
-            or os.environ.get("NOMINATIM_USER_AGENT", "")
-            or "xlevage-site/1.0 (contact: biuro.x-estetik@op.pl)"
-        )
-
-        resp = requests.get(
+        resp = _nominatim.get(
             "https://nominatim.openstreetmap.org/search",
             params={
                 "format": "json",
@@ -1189,32 +2005,55 @@ def geocode_address(address: str):
                 "countrycodes": "pl",
                 "addressdetails": 0,
             },
-            headers={
-                "User-Agent": ua,
-                "Accept-Language": "pl",
-            },
-            timeout=12,
+            timeout=10,
         )
-        resp.raise_for_status()
-        data = resp.json()
+        try:
+            resp.raise_for_status()
+            # Parse the raw bytes directly (limit=1 keeps the body small).
+            data = json.loads(resp.content)
+        finally:
+            resp.close()  # hand the connection back to the session pool
         if not data:
-            _save_geocode_cache(address, None, None)
             return (None, None)
-        lat = float(data[0]["lat"])
-        lon = float(data[0]["lon"])
-        _save_geocode_cache(address, lat, lon)
-        return (lat, lon)
+        return (float(data[0]["lat"]), float(data[0]["lon"]))
     except Exception:
-        _save_geocode_cache(address, None, None)
         return (None, None)
 
-def _save_geocode_cache(address, lat, lon):
-    db = get_db()
-    db.execute(
-        "INSERT OR REPLACE INTO geocode_cache(address,lat,lon,updated_at) VALUES(?,?,?,?)",
-        (address, lat, lon, datetime.utcnow().isoformat(timespec="seconds")),
-    )
-    db.commit()
+def _save_geocode_cache(rows, overwrite=None):
+    """Store [(address, lat, lon, updated_at), ...] in one transaction.
+
+    Positive results are also copied into clinics that still lack coordinates,
+    and into the clinics listed for that address in `overwrite`
+    ({address: {clinic_id, ...}}) whatever they hold.
+    """
+    found = [(lat, lon, ts, address) for address, lat, lon, ts in rows if lat and lon]
+    forced = [
+        (lat, lon, ts, cid, address)
+        for lat, lon, ts, address in found
+        for cid in (overwrite or {}).get(address, ())
+    ]
+    with write_transaction() as tx:
+        tx.executemany(
+            "INSERT INTO geocode_cache(address,lat,lon,updated_at) VALUES(?,?,?,?) "
+            "ON CONFLICT(address) DO UPDATE SET "
+            "lat=excluded.lat, lon=excluded.lon, updated_at=excluded.updated_at",
+            rows,
+        )
+        tx.executemany(
+            "UPDATE clinics SET lat=?, lon=?, updated_at=? "
+            "WHERE address=? AND (lat IS NULL OR lon IS NULL)",
+            found,
+        )
+        # The address check skips clinics edited again while the lookup ran.
+        tx.executemany(
+            "UPDATE clinics SET lat=?, lon=?, updated_at=? WHERE id=? AND address=?",
+            forced,
+        )
+    if found:
+        memo = current_app.extensions["geocode_memo"]
+        for lat, lon, _ts, address in found:
+            _memo_geocode(memo, address, (lat, lon))
+        invalidate_clinics()
 
 # -------------------- Bulk import --------------------
 def bulk_import(raw: str, default_type="authorized"):
@@ -1222,8 +2061,13 @@ def bulk_import(raw: str, default_type="authorized"):
     Format (one clinic per line):
       name | address | city | phone | website | kind
     kind is optional: ambassadors/authorized
+
+    All rows are written in a single transaction. Coordinates come from the
+    geocode cache; unknown addresses are queued for the background geocoder,
+    so the import does not wait on Nominatim's 1 request/second limit.
     """
-    created = updated = skipped = 0
+    skipped = parsed = 0
+    entries = {}  # (name, address) -> (kind, city, phone, website); last line wins
     for line in (raw or "").splitlines():
         line = line.strip()
         if not line or line.startswith("#"):
@@ -1238,29 +2082,148 @@ def bulk_import(raw: str, default_type="authorized"):
         website = parts[4] if len(parts) > 4 else ""
         kind = parts[5] if len(parts) > 5 and parts[5] else default_type
         kind = "ambassadors" if kind.lower().startswith("amb") else "authorized"
+        entries[(name, address)] = (kind, city, phone, website)
+        parsed += 1
 
-        # Dedup by (name,address)
-        db = get_db()
-        existing = db.execute("SELECT id FROM clinics WHERE name=? AND address=?", (name, address)).fetchone()
-        data = {"kind": kind, "name": name, "address": address, "city": city, "phone": phone, "website": website, "notes": ""}
-        if existing:
-            upsert_clinic(existing["id"], data, geocode_if_missing=True)
-            updated += 1
+    # Dedup by (name,address) against the DB. The clinics table is small, so
+    # one constant query over all rows beats per-key lookups or chunked IN lists.
+    db = get_db()
+    existing = {}  # (name, address) -> (id, has_coords)
+    for r in db.execute(_SQL_CLINIC_KEYS).fetchall():
+        existing[(r["name"], r["address"])] = (r["id"], bool(r["lat"] and r["lon"]))
+
+    now = utc_now_iso()
+    inserts, updates, to_geocode = [], [], set()
+    for (name, address), (kind, city, phone, website) in entries.items():
+        found = existing.get((name, address))
+        if found is None:
+            lat, lon = lookup_geocode_cache(db, address) or (None, None)
+            if not (lat and lon):
+                to_geocode.add(address)
+            inserts.append((kind, name, address, city, phone, website, "", lat, lon, now, now))
         else:
-            upsert_clinic(None, data, geocode_if_missing=True)
-            created += 1
-    return created, updated, skipped
+            cid, has_coords = found
+            if not has_coords:
+                to_geocode.add(address)
+            updates.append((kind, city, phone, website, "", now, cid))
+
+    with write_transaction() as tx:
+        tx.executemany(_SQL_UPSERT_CLINIC, inserts)
+        tx.executemany(_SQL_IMPORT_UPDATE_CLINIC, updates)
+    invalidate_clinics()
+
+    for address in to_geocode:
+        request_geocode(address)
+
+    created = len(inserts)
+    return created, parsed - created, skipped
+
+
+# -------------------- Mail --------------------
+# Authenticated SMTP sessions are reused across leads instead of paying the
+# TCP + STARTTLS + AUTH handshake for every message. A session is checked with
+# NOOP before reuse and recycled after SMTP_POOL_MAX_AGE seconds or
+# SMTP_POOL_MAX_MESSAGES messages.
+SMTP_POOL_MAX_AGE = 100.0
+SMTP_POOL_MAX_MESSAGES = 100
+
+_smtp_pool: dict = {}  # (host, port, user) -> [SMTP, created_monotonic, sent_count]
+_smtp_lock = threading.Lock()
+
+
+def _smtp_close(server) -> None:
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+
+def _get_smtp(host: str, port: int, user: str, password: str, tls: bool):
+    """Return a live pooled SMTP session. Caller must hold `_smtp_lock`."""
+    key = (host, port, user)
+    entry = _smtp_pool.pop(key, None)
+    if entry is not None:
+        server, created, sent = entry
+        fresh = sent < SMTP_POOL_MAX_MESSAGES and (time.monotonic() - created) < SMTP_POOL_MAX_AGE
+        if fresh:
+            try:
+                alive = server.noop()[0] == 250
+            except Exception:
+                alive = False
+            if alive:
+                _smtp_pool[key] = entry
+                return server
+        _smtp_close(server)
+
+    server = smtplib.SMTP(host, port, timeout=20)
+    try:
+        server.ehlo()
+        if tls:
+            server.starttls()
+            server.ehlo()
+        if user and password:
+            server.login(user, password)
+    except Exception:
+        _smtp_close(server)
+        raise
+    _smtp_pool[key] = [server, time.monotonic(), 0]
+    return server
+
+
+def smtp_sendmail(from_addr: str, to_addrs: List[str], raw: bytes, *,
+                  host: str, port: int, user: str, password: str, tls: bool) -> None:
+    """Send an already flattened (CRLF) message over a pooled SMTP session; raises on failure."""
+    key = (host, port, user)
+    with _smtp_lock:
+        # A pooled session can still be dropped by the server between NOOP and
+        # MAIL FROM; in that case reconnect once and resend.
+        for attempt in (1, 2):
+            reused = key in _smtp_pool
+            server = _get_smtp(host, port, user, password, tls)
+            try:
+                server.sendmail(from_addr, to_addrs, raw)
+            except Exception as exc:
+                # Never hand a session in an unknown state to the next lead.
+                _smtp_pool.pop(key, None)
+                _smtp_close(server)
+                if attempt == 1 and reused and isinstance(exc, smtplib.SMTPServerDisconnected):
+                    continue
+                raise
+            _smtp_pool[key][2] += 1
+            return
+
+
+@atexit.register
+def _smtp_close_all() -> None:
+    with _smtp_lock:
+        for server, _created, _sent in _smtp_pool.values():
+            _smtp_close(server)
+        _smtp_pool.clear()
 
 # -------------------- Static helpers --------------------
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")  # str.endswith() takes the tuple
+
 def list_static_images(folder: str):
     base = os.path.join(APP_DIR, "static", folder)
-    exts = (".png", ".jpg", ".jpeg", ".webp")
-    out = []
-    if os.path.isdir(base):
-        for name in sorted(os.listdir(base)):
-            if name.lower().endswith(exts):
-                out.append(f"/static/{folder}/{name}")
-    return out
+    try:
+        mtime = os.stat(base).st_mtime_ns
+    except OSError:
+        return []
+    return _list_images_cached(folder, mtime)
+
+
+# Keyed on the directory mtime: adding/removing a file bumps it, so a stale
+# listing is simply never looked up again.
+@lru_cache(maxsize=32)
+def _list_images_cached(folder: str, mtime_ns: int):
+    base = os.path.join(APP_DIR, "static", folder)
+    with os.scandir(base) as it:
+        names = [e.name for e in it if e.name.lower().endswith(IMAGE_EXTS)]
+    names.sort()
+    return [f"/static/{folder}/{name}" for name in names]
 
 app = create_app()
 